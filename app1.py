@@ -10,13 +10,16 @@ Enhanced Budget Tracker with Reports - Streamlit Single File App
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sqlite3
+import threading
 from datetime import datetime, date
 import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
 from io import BytesIO
 from fpdf import FPDF  # This should work with fpdf2
+from fpdf.fonts import FontFace
 import tempfile
 import os
 import time
@@ -30,6 +33,22 @@ st.set_page_config(
 )
 
 DB_PATH = "budget_tracker.db"
+PAGE_SIZE = 200  # rows per page in the transactions table
+TX_COLUMNS = "id, type, category, amount, currency, date, notes"
+INSERT_COLUMNS = ("type", "category", "amount", "currency", "date", "notes")
+# One SQL string for every insert so sqlite3's per-connection statement cache reuses the prepared statement
+INSERT_SQL = f"INSERT INTO transactions ({', '.join(INSERT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)"
+DATE_PARSE = {"date": {"format": "%Y-%m-%d"}}  # dates are stored as ISO text
+
+# WAL lets the read connection see committed data while a write is in
+# flight; NORMAL sync skips the per-commit fsync that rollback-journal mode pays.
+PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA busy_timeout=5000;
+PRAGMA cache_size=-20000;
+"""
 
 # Custom CSS for modern styling and animations
 st.markdown("""
@@ -88,10 +107,35 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---------- Database helpers ----------
+@st.cache_resource
+def get_conn():
+    """Shared write connection reused across reruns and sessions, with the tuned PRAGMAs applied"""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    conn.executescript(PRAGMAS)
+    return conn
+
+@st.cache_resource
+def get_read_conn():
+    """Shared read-only connection for dashboard queries.
+
+    Kept separate from the write connection so reads never see rows from a write
+    transaction that has not committed yet.
+    """
+    init_db()  # schema and WAL mode must exist before the first read
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    conn.executescript(PRAGMAS + "PRAGMA query_only=ON;")
+    return conn
+
+@st.cache_resource
+def get_write_lock():
+    """Serialize writers on the shared connection (SQLite allows one writer anyway)"""
+    return threading.Lock()
+
+@st.cache_resource
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
+    """Create the schema and indexes and gather planner statistics, once per server process"""
+    conn = get_conn()
+    conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS transactions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -101,49 +145,156 @@ def init_db():
             currency TEXT NOT NULL,
             date TEXT NOT NULL,        -- YYYY-MM-DD
             notes TEXT
-        )
+        );
+        CREATE INDEX IF NOT EXISTS idx_tx_date ON transactions(date);
+        CREATE INDEX IF NOT EXISTS idx_tx_type_date ON transactions(type, date);
+        ANALYZE;
         """
     )
-    conn.commit()
-    conn.close()
 
 def add_transaction(tx_type, category, amount, currency, tx_date, notes=""):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO transactions (type, category, amount, currency, date, notes) VALUES (?, ?, ?, ?, ?, ?)",
-        (tx_type, category, float(amount), currency, tx_date, notes),
-    )
-    conn.commit()
-    conn.close()
-
-def load_transactions():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM transactions ORDER BY date DESC, id DESC", conn, parse_dates=["date"])
-    conn.close()
-    if not df.empty:
-        df['date'] = pd.to_datetime(df['date']).dt.date
+    conn = get_conn()
+    # Take the write lock up front rather than upgrading a deferred transaction mid-insert
+    with get_write_lock(), conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(INSERT_SQL, (tx_type, category, float(amount), currency, tx_date, notes))
+    _bump_tx_version()
+
+def _bump_tx_version():
+    """Invalidate cached reads after a write"""
+    st.session_state["tx_version"] = st.session_state.get("tx_version", 0) + 1
+    st.cache_data.clear()
+
+@st.cache_data(ttl=None)
+def load_transactions(version: int) -> pd.DataFrame:
+    """Load all transactions; `version` keys the cache and is bumped on every write"""
+    df = pd.read_sql_query(f"SELECT {TX_COLUMNS} FROM transactions ORDER BY date DESC, id DESC",
+                           get_read_conn(), parse_dates=DATE_PARSE)
+    # Derived filter keys, computed once per load instead of on every filter
+    df['_year'] = df['date'].dt.year.astype('int16')
+    df['_month'] = df['date'].dt.month.astype('int8')
     return df
 
-def bulk_insert_transactions(transactions_df):
-    """Insert multiple transactions at once"""
-    conn = sqlite3.connect(DB_PATH)
-    transactions_df.to_sql('transactions', conn, if_exists='append', index=False)
-    conn.commit()
-    conn.close()
+def visible_columns(df):
+    """Drop the underscore-prefixed helper columns added by load_transactions"""
+    return df.loc[:, ~df.columns.str.startswith('_')]
+
+def period_mask(df, year=None, month=None):
+    """Boolean mask over a loaded transactions frame for the year/month filters"""
+    mask = pd.Series(True, index=df.index)
+    if year:
+        mask &= df['_year'].eq(year)
+    if month:
+        mask &= df['_month'].eq(month)
+    return mask
+
+def filter_period(df, year=None, month=None):
+    """Rows of a loaded transactions frame matching the year/month filters"""
+    return df[period_mask(df, year, month)]
+
+def bulk_insert_transactions(columns):
+    """Insert multiple transactions at once from the column arrays built by process_uploaded_file"""
+    records = list(zip(*(columns[name].tolist() for name in INSERT_COLUMNS)))
+    conn = get_conn()
+    # Autocommit connection: open one explicit transaction so the rows commit together
+    with get_write_lock(), conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(INSERT_SQL, records)
+    # Large imports shift the row distribution; once the rows are committed,
+    # refresh stats if SQLite thinks they are stale
+    conn.execute("PRAGMA optimize")
+    _bump_tx_version()
+
+def _period_filter(year=None, month=None):
+    """Build WHERE clauses and params for the year/month filters.
+
+    Year filters become a half-open ISO date range so SQLite can use the date indexes.
+    """
+    if year:
+        start = date(year, month or 1, 1)
+        if month:
+            end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        else:
+            end = date(year + 1, 1, 1)
+        return ["date >= ?", "date < ?"], [start.isoformat(), end.isoformat()]
+    if month:
+        return ["strftime('%m', date) = ?"], [f"{month:02d}"]
+    return [], []
+
+def _where(clauses):
+    """Join filter clauses into a WHERE fragment (empty when unfiltered)"""
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+@st.cache_data(ttl=None)
+def query_summary(version, year=None, month=None):
+    """SQL counterpart of monthly_summary, aggregated inside SQLite"""
+    clauses, params = _period_filter(year, month)
+    totals = dict(get_read_conn().execute(
+        f"SELECT type, SUM(amount) FROM transactions {_where(clauses)} GROUP BY type", params
+    ).fetchall())
+    income = totals.get('income') or 0.0
+    expense = totals.get('expense') or 0.0
+    return pd.DataFrame({
+        "metric": ["Total Income", "Total Expense", "Balance"],
+        "value": [income, expense, income - expense]
+    })
+
+@st.cache_data(ttl=None)
+def query_category_breakdown(version, year=None, month=None, tx_type='expense'):
+    """SQL counterpart of category_breakdown, aggregated inside SQLite"""
+    clauses, params = _period_filter(year, month)
+    where = " AND ".join(["type = ?"] + clauses)
+    return pd.read_sql_query(
+        f"SELECT category, SUM(amount) AS amount FROM transactions WHERE {where} "
+        "GROUP BY category ORDER BY amount DESC",
+        get_read_conn(),
+        params=[tx_type] + params,
+    )
+
+@st.cache_data(ttl=None)
+def query_transaction_count(version, year=None, month=None):
+    """Number of transactions matching the year/month filters"""
+    clauses, params = _period_filter(year, month)
+    return get_read_conn().execute(f"SELECT COUNT(*) FROM transactions {_where(clauses)}", params).fetchone()[0]
+
+@st.cache_data(ttl=None)
+def query_transactions_page(version, year=None, month=None, page=1, page_size=PAGE_SIZE):
+    """One page of transactions matching the filters, newest first"""
+    clauses, params = _period_filter(year, month)
+    return pd.read_sql_query(
+        f"SELECT {TX_COLUMNS} FROM transactions {_where(clauses)} ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+        get_read_conn(),
+        params=params + [page_size, (page - 1) * page_size],
+        parse_dates=DATE_PARSE,
+    )
+
+@st.cache_data(ttl=None)
+def query_trend(version):
+    """Monthly income/expense totals as (months, income, expense) arrays, aggregated inside SQLite"""
+    rows = get_read_conn().execute(
+        """
+        SELECT substr(date, 1, 7) AS month_year,
+               SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END) AS income,
+               SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END) AS expense
+        FROM transactions
+        GROUP BY month_year
+        ORDER BY month_year
+        """
+    ).fetchall()
+    if not rows:
+        return np.array([], dtype=object), np.array([]), np.array([])
+    months, income, expense = zip(*rows)
+    return np.array(months, dtype=object), np.array(income, dtype=float), np.array(expense, dtype=float)
 
 # ---------- Report / visualization helpers ----------
 def monthly_summary(df, year=None, month=None):
     if df.empty:
         return pd.DataFrame(columns=["metric","value"])
-    tmp = df.copy()
-    tmp['date'] = pd.to_datetime(tmp['date'])
-    if year:
-        tmp = tmp[tmp['date'].dt.year == year]
-    if month:
-        tmp = tmp[tmp['date'].dt.month == month]
-    income = tmp[tmp['type'] == 'income']['amount'].sum()
-    expense = tmp[tmp['type'] == 'expense']['amount'].sum()
+    # One grouped pass over the filtered rows instead of a masked sum per type
+    mask = period_mask(df, year, month)
+    totals = df.loc[mask, ['type', 'amount']].groupby('type', sort=False)['amount'].sum()
+    income = totals.get('income', 0.0)
+    expense = totals.get('expense', 0.0)
     balance = income - expense
     return pd.DataFrame({
         "metric": ["Total Income", "Total Expense", "Balance"],
@@ -153,14 +304,9 @@ def monthly_summary(df, year=None, month=None):
 def category_breakdown(df, year=None, month=None, tx_type='expense'):
     if df.empty:
         return pd.DataFrame(columns=["category","amount"])
-    tmp = df.copy()
-    tmp['date'] = pd.to_datetime(tmp['date'])
-    if year:
-        tmp = tmp[tmp['date'].dt.year == year]
-    if month:
-        tmp = tmp[tmp['date'].dt.month == month]
-    tmp = tmp[tmp['type'] == tx_type]
-    return tmp.groupby('category')['amount'].sum().reset_index().sort_values('amount', ascending=False)
+    mask = period_mask(df, year, month) & df['type'].eq(tx_type)
+    return (df.loc[mask, ['category', 'amount']].groupby('category')['amount'].sum()
+            .reset_index().sort_values('amount', ascending=False))
 
 def create_animated_chart(df_cat, title):
     if df_cat.empty:
@@ -168,32 +314,26 @@ def create_animated_chart(df_cat, title):
         fig.add_annotation(text="No data available", x=0.5, y=0.5, showarrow=False, font=dict(size=16))
         fig.update_layout(title=title)
     else:
-        fig = px.pie(df_cat, values='amount', names='category', title=title,
-                    color_discrete_sequence=px.colors.sequential.Plasma)
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        fig.update_layout(transition={'duration': 500})
+        # Feed go.Pie the column arrays directly; px.pie would re-wrap the frame first
+        palette = px.colors.sequential.Plasma
+        colors = [palette[i % len(palette)] for i in range(len(df_cat))]
+        fig = go.Figure(go.Pie(values=df_cat['amount'].to_numpy(), labels=df_cat['category'].to_numpy(),
+                               textposition='inside', textinfo='percent+label', marker=dict(colors=colors)))
+        fig.update_layout(title=title, transition={'duration': 500})
     return fig
 
-def create_trend_chart(df):
-    if df.empty:
+def create_trend_chart(months, income, expense):
+    """Plot the (months, income, expense) arrays returned by query_trend"""
+    if months.size == 0:
         fig = go.Figure()
         fig.add_annotation(text="No data available", x=0.5, y=0.5, showarrow=False, font=dict(size=16))
         return fig
     
-    df_trend = df.copy()
-    df_trend['date'] = pd.to_datetime(df_trend['date'])
-    df_trend['month_year'] = df_trend['date'].dt.to_period('M').astype(str)
-    
-    monthly = df_trend.groupby(['month_year', 'type'])['amount'].sum().reset_index()
-    monthly_pivot = monthly.pivot(index='month_year', columns='type', values='amount').fillna(0)
-    
     fig = go.Figure()
-    if 'income' in monthly_pivot.columns:
-        fig.add_trace(go.Scatter(x=monthly_pivot.index, y=monthly_pivot['income'], 
-                               name='Income', line=dict(color='#2ecc71', width=3)))
-    if 'expense' in monthly_pivot.columns:
-        fig.add_trace(go.Scatter(x=monthly_pivot.index, y=monthly_pivot['expense'], 
-                               name='Expense', line=dict(color='#e74c3c', width=3)))
+    fig.add_trace(go.Scatter(x=months, y=income, 
+                           name='Income', line=dict(color='#2ecc71', width=3)))
+    fig.add_trace(go.Scatter(x=months, y=expense, 
+                           name='Expense', line=dict(color='#e74c3c', width=3)))
     
     fig.update_layout(
         title="Monthly Income vs Expense Trend",
@@ -206,14 +346,15 @@ def create_trend_chart(df):
     return fig
 
 # ---------- Export helpers ----------
-def to_excel_bytes(df):
+def to_excel_bytes(df, summary=None):
+    """Serialize transactions plus a summary sheet; pass `summary` to skip recomputing it from `df`"""
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+    with pd.ExcelWriter(output, engine='xlsxwriter', datetime_format='yyyy-mm-dd', date_format='yyyy-mm-dd') as writer:
         df.to_excel(writer, index=False, sheet_name='transactions')
         # Add summary sheet
-        summary = monthly_summary(df)
+        if summary is None:
+            summary = monthly_summary(df)
         summary.to_excel(writer, index=False, sheet_name='summary')
-        writer.save()
     return output.getvalue()
 
 def create_pdf_report(df, summary_df, category_df, period_name="All time", currency="PKR"):
@@ -233,14 +374,21 @@ def create_pdf_report(df, summary_df, category_df, period_name="All time", curre
     pdf.cell(0, 10, "Financial Summary", ln=True)
     pdf.ln(5)
     
+    # Balance is green/red by sign; the other metrics stay black
+    def summary_color(metric, value):
+        if metric == 'Balance':
+            return (0, 128, 0) if value >= 0 else (255, 0, 0)
+        return (0, 0, 0)
+
     pdf.set_font("Arial", "", 12)
-    for _, row in summary_df.iterrows():
-        if row['metric'] == 'Balance':
-            color = (0, 128, 0) if row['value'] >= 0 else (255, 0, 0)
-        else:
-            color = (0, 0, 0)
-        pdf.set_text_color(*color)
-        pdf.cell(0, 8, f"{row['metric']}: {row['value']:.2f} {currency}", ln=True)
+    # Text is already black from the heading; only emit a color change when it differs
+    current_color = (0, 0, 0)
+    for metric, value in zip(summary_df['metric'].tolist(), summary_df['value'].tolist()):
+        color = summary_color(metric, value)
+        if color != current_color:
+            pdf.set_text_color(*color)
+            current_color = color
+        pdf.cell(0, 8, f"{metric}: {value:.2f} {currency}", ln=True)
     
     pdf.ln(10)
     pdf.set_text_color(0, 0, 0)
@@ -255,8 +403,10 @@ def create_pdf_report(df, summary_df, category_df, period_name="All time", curre
         if category_df.empty:
             pdf.cell(0, 8, "No category data available.", ln=True)
         else:
-            for _, r in category_df.iterrows():
-                pdf.cell(0, 7, f"{r['category']}: {r['amount']:.2f} {currency}", ln=True)
+            lines = [f"{cat}: {amt:.2f} {currency}"
+                     for cat, amt in zip(category_df['category'].tolist(), category_df['amount'].tolist())]
+            for line in lines:
+                pdf.cell(0, 7, line, ln=True)
 
     add_category_breakdown(pdf, category_df, currency)
 
@@ -269,23 +419,23 @@ def create_pdf_report(df, summary_df, category_df, period_name="All time", curre
     if df.empty:
         pdf.cell(0, 8, "No transactions to show.", ln=True)
     else:
-        # Header
-        pdf.set_fill_color(102, 126, 234)
-        pdf.set_text_color(255, 255, 255)
-        pdf.cell(30, 8, "Date", border=1, fill=True)
-        pdf.cell(25, 8, "Type", border=1, fill=True)
-        pdf.cell(50, 8, "Category", border=1, fill=True)
-        pdf.cell(30, 8, f"Amount ({currency})", border=1, fill=True, ln=True)
-        
-        # Rows
+        # Rows: slice and format the columns once, then lay them out as one fpdf2 table
+        recent = df.head(20)
+        rows = zip(
+            recent['date'].dt.strftime('%Y-%m-%d').tolist(),
+            recent['type'].tolist(),
+            [str(c)[:30] for c in recent['category'].tolist()],
+            [f"{a:.2f}" for a in recent['amount'].tolist()],
+        )
         pdf.set_text_color(0, 0, 0)
-        for _, r in df.head(20).iterrows():
-            pdf.cell(30, 7, str(r['date']), border=1)
-            pdf.cell(25, 7, r['type'], border=1)
-            pdf.cell(50, 7, str(r['category'])[:30], border=1)
-            pdf.cell(30, 7, f"{r['amount']:.2f}", border=1, ln=True)
+        header_style = FontFace(color=(255, 255, 255), fill_color=(102, 126, 234))
+        with pdf.table(width=135, col_widths=(30, 25, 50, 30), align="LEFT", line_height=7,
+                       headings_style=header_style) as table:
+            table.row(("Date", "Type", "Category", f"Amount ({currency})"))
+            for row in rows:
+                table.row(row)
 
-    return pdf.output(dest='S').encode('latin-1')
+    return bytes(pdf.output())
 
 # ---------- File upload processing ----------
 def process_uploaded_file(uploaded_file):
@@ -299,17 +449,35 @@ def process_uploaded_file(uploaded_file):
         
         # Validate required columns
         required_cols = ['type', 'category', 'amount', 'currency', 'date']
-        if (missing_cols := [col for col in required_cols if col not in df.columns]):
-            return None, f"Missing required columns: {', '.join(missing_cols)}"
+        if (missing_cols := set(required_cols).difference(df.columns)):
+            return None, f"Missing required columns: {', '.join(sorted(missing_cols))}"
+        
+        # Reject blank cells up front; the NOT NULL columns would otherwise fail mid-import
+        blank = df[required_cols].isna().any()
+        if blank.any():
+            return None, f"Blank values in required columns: {', '.join(blank.index[blank])}"
         
         # Validate data types
         try:
-            df['amount'] = pd.to_numeric(df['amount'])
-            df['date'] = pd.to_datetime(df['date']).dt.date
+            amounts = pd.to_numeric(df['amount']).astype(np.float64)
+            dates = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
         except:
             return None, "Invalid data types in amount or date columns"
-            
-        return df, "File processed successfully!"
+        if dates.isna().any():
+            return None, "Invalid data types in amount or date columns"
+        
+        # One array per column, ready for executemany. Blanks are already rejected or
+        # filled above, so str() can't produce 'nan'; it keeps Excel date cells readable.
+        notes = df['notes'].fillna('').astype(str) if 'notes' in df.columns else pd.Series([''] * len(df))
+        columns = {
+            'type': df['type'].astype(str).to_numpy(),
+            'category': df['category'].astype(str).to_numpy(),
+            'amount': amounts.to_numpy(),
+            'currency': df['currency'].astype(str).to_numpy(),
+            'date': dates.to_numpy(),
+            'notes': notes.to_numpy(),
+        }
+        return columns, "File processed successfully!"
         
     except Exception as e:
         return None, f"Error processing file: {str(e)}"
@@ -318,7 +486,8 @@ def process_uploaded_file(uploaded_file):
 st.markdown('<h1 class="main-header">💸 Budget Tracker Pro</h1>', unsafe_allow_html=True)
 
 init_db()
-df = load_transactions()
+tx_version = st.session_state.get("tx_version", 0)
+df = load_transactions(tx_version)
 
 # Sidebar with enhanced UI
 with st.sidebar:
@@ -351,13 +520,13 @@ with st.sidebar:
     st.markdown('</div>', unsafe_allow_html=True)
     
     if uploaded_file is not None:
-        processed_df, message = process_uploaded_file(uploaded_file)
-        if processed_df is not None:
+        processed, message = process_uploaded_file(uploaded_file)
+        if processed is not None:
             st.success(message)
             if st.button("Import Transactions", use_container_width=True):
                 with st.spinner("Importing transactions..."):
-                    bulk_insert_transactions(processed_df)
-                    st.success(f"Successfully imported {len(processed_df)} transactions!")
+                    bulk_insert_transactions(processed)
+                    st.success(f"Successfully imported {len(processed['amount'])} transactions!")
                     time.sleep(2)
                     st.rerun()
         else:
@@ -368,7 +537,8 @@ with st.sidebar:
 st.markdown("### 📊 Dashboard")
 col1, col2, col3, col4 = st.columns([2,2,2,1])
 with col1:
-    years = sorted({datetime.now().year} if df.empty else {d.year for d in pd.to_datetime(df['date']).dt.date}, reverse=True)
+    years_arr = np.array([datetime.now().year]) if df.empty else np.unique(df['_year'].to_numpy())
+    years = years_arr[::-1].tolist()
     year = st.selectbox("Year", options=["All"] + [str(y) for y in years], index=0)
 with col2:
     months = list(range(1,13))
@@ -387,7 +557,7 @@ sel_month = None if month_idx == "All" else (month_names.index(month_idx))
 
 # Summary metrics with animations
 st.markdown("---")
-summary_df = monthly_summary(df, sel_year, sel_month)
+summary_df = query_summary(tx_version, sel_year, sel_month)
 if not summary_df.empty:
     cols = st.columns(3)
     metrics = [
@@ -412,12 +582,12 @@ chart_col1, chart_col2 = st.columns(2)
 
 with chart_col1:
     st.markdown("#### 📈 Monthly Trend")
-    trend_fig = create_trend_chart(df)
+    trend_fig = create_trend_chart(*query_trend(tx_version))
     st.plotly_chart(trend_fig, use_container_width=True)
 
 with chart_col2:
     st.markdown("#### 🥧 Expense Categories")
-    cat_df = category_breakdown(df, sel_year, sel_month, tx_type='expense')
+    cat_df = query_category_breakdown(tx_version, sel_year, sel_month, tx_type='expense')
     pie_fig = create_animated_chart(cat_df, "Expense Distribution")
     st.plotly_chart(pie_fig, use_container_width=True)
 
@@ -425,17 +595,17 @@ with chart_col2:
 st.markdown("---")
 st.markdown("### 📋 All Transactions")
 if not df.empty:
-    # Apply filters to displayed table
-    filtered_df = df.copy()
-    if sel_year:
-        filtered_df = filtered_df[pd.to_datetime(filtered_df['date']).dt.year == sel_year]
-    if sel_month:
-        filtered_df = filtered_df[pd.to_datetime(filtered_df['date']).dt.month == sel_month]
+    # Only fetch the page being shown; formatting happens in the browser
+    total_rows = query_transaction_count(tx_version, sel_year, sel_month)
+    n_pages = max(1, -(-total_rows // PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
+    page_df = query_transactions_page(tx_version, sel_year, sel_month, page)
+    st.caption(f"Showing {len(page_df)} of {total_rows} transactions (page {page} of {n_pages})")
     
-    st.dataframe(filtered_df.style.format({
-        'amount': '{:,.2f}',
-        'date': lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else ''
-    }), use_container_width=True)
+    st.dataframe(page_df, column_config={
+        'amount': st.column_config.NumberColumn(format='%.2f'),
+        'date': st.column_config.DateColumn(format='YYYY-MM-DD'),
+    }, use_container_width=True)
 else:
     st.info("No transactions found. Start by adding transactions in the sidebar!")
 
@@ -451,7 +621,7 @@ with export_col1:
         if df.empty:
             st.warning("No transactions to export.")
         else:
-            excel_bytes = to_excel_bytes(df)
+            excel_bytes = to_excel_bytes(visible_columns(df), summary=query_summary(tx_version))
             st.download_button(
                 "💾 Download Excel File",
                 data=excel_bytes,
@@ -469,11 +639,7 @@ with export_col2:
         period_name = f"{sel_year}"
     
     if st.button("📄 Generate PDF Report", use_container_width=True):
-        filtered = df.copy()
-        if sel_year:
-            filtered = filtered[pd.to_datetime(filtered['date']).dt.year == sel_year]
-        if sel_month:
-            filtered = filtered[pd.to_datetime(filtered['date']).dt.month == sel_month]
+        filtered = filter_period(df, sel_year, sel_month)
 
         if filtered.empty:
             st.warning("No data for selected filters.")